@@ -1,21 +1,44 @@
 """Main agent loop for Henri."""
 
 import asyncio
+import functools
+import json
 import os
 import sys
+import time
 
 from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
 from rich.console import Console
 from rich.markup import escape as rich_escape
 from rich.panel import Panel
 from rich.status import Status
 
-from henri.messages import Message, ToolResult
-from henri.permissions import PermissionManager
+from henri.history import WriteBehindFileHistory
+from henri.messages import Message, ToolCall, ToolResult
+from henri.permissions import SHARED_CONSOLE, PermissionManager, short_repr
 from henri.providers import Provider, create_provider
 from henri.tools.base import Tool, get_default_tools
 
+# Shared style for tool argument and result panels
+_PANEL_STYLE = {"border_style": "dim", "padding": (0, 1)}
+
+# Streamed text is written in batches at most this far apart (seconds)
+_TEXT_FLUSH_INTERVAL = 0.03
+
+
+def _head_lines(text: str, limit: int) -> tuple[str, int]:
+    """Return the first `limit` lines of text and the number of lines cut.
+
+    Scans only as far as the limit-th newline instead of splitting the
+    whole text, which matters for multi-megabyte tool output.
+    """
+    idx = -1
+    for _ in range(limit):
+        idx = text.find("\n", idx + 1)
+        if idx < 0:
+            return text, 0
+    return text[:idx], text.count("\n", idx)
+
 
 def summarize_tools_and_permissions(
     tools: list[Tool],
@@ -46,16 +69,8 @@ def summarize_tools_and_permissions(
     return tool_lines, perm_lines
 
 
-def build_system_prompt(
-    tools: list[Tool],
-    auto_allow_cwd: set[str] | None = None,
-    auto_allow: set[str] | None = None,
-    reject_prompts: bool = False,
-) -> str:
-    """Build system prompt with available tools and permissions."""
-    tool_lines, perm_lines = summarize_tools_and_permissions(
-        tools, auto_allow_cwd or set(), auto_allow or set(), reject_prompts
-    )
+def build_system_prompt(tool_lines: list[str], perm_lines: list[str]) -> str:
+    """Build system prompt from the tools and permissions summary."""
     tools_section = "\n".join(tool_lines)
     perms_section = "\n".join(perm_lines)
     return f"""You are Henri, a helpful coding assistant.
@@ -79,21 +94,41 @@ class Agent:
         console: Console | None = None,
         permissions: PermissionManager | None = None,
         max_turns: int | None = None,
+        max_history_messages: int | None = None,
     ):
         self.provider = provider
         self.tools = tools or get_default_tools()
         self.tools_by_name = {t.name: t for t in self.tools}
-        self.console = console or Console()
+        self.console = console or SHARED_CONSOLE
         self.permissions = permissions or PermissionManager(console=self.console)
-        self.system_prompt = build_system_prompt(
+        # Tools that are allowed unconditionally, checked without the manager
+        self._always_allow = frozenset(
+            t.name for t in self.tools
+            if not t.requires_permission or t.name in self.permissions.auto_allow
+        )
+        # Summarized once: used for the system prompt and the startup banner
+        self.tool_lines, self.perm_lines = summarize_tools_and_permissions(
             self.tools,
-            auto_allow_cwd=self.permissions.auto_allow_cwd,
-            auto_allow=self.permissions.auto_allow,
-            reject_prompts=self.permissions.reject_prompts,
+            self.permissions.auto_allow_cwd,
+            self.permissions.auto_allow,
+            self.permissions.reject_prompts,
+        )
+        self.system_prompt = build_system_prompt(self.tool_lines, self.perm_lines)
+        # Tools and system prompt are fixed for the session, so bind them once
+        self._stream = functools.partial(
+            self.provider.stream, tools=self.tools, system=self.system_prompt
         )
         self.messages: list[Message] = []
+        if max_history_messages is not None and max_history_messages < 3:
+            raise ValueError("max_history_messages must be at least 3")
+        self.max_history_messages = max_history_messages
         self._status: Status | None = None
+        self._status_visible = False
         self._pondering_task: asyncio.Task | None = None
+        self._text_buf: list[str] = []
+        self._text_flush_handle: asyncio.TimerHandle | None = None
+        self._last_text_flush = 0.0
+        self._last_text_time = 0.0
 
         # Metrics
         self.max_turns = max_turns
@@ -108,28 +143,83 @@ class Agent:
             self._pondering_task = None
 
     def _schedule_pondering(self, delay: float = 0.5) -> None:
-        """Schedule showing 'Pondering...' after a delay."""
-        self._cancel_pondering()
+        """Show 'Pondering...' once no text has arrived for `delay` seconds.
+
+        Called per text chunk, so it only records the time; a single watcher
+        task per pause does the waiting instead of a new task per chunk.
+        """
+        self._last_text_time = time.monotonic()
+        if self._pondering_task and not self._pondering_task.done():
+            return
 
         async def show_pondering():
-            await asyncio.sleep(delay)
+            while (remaining := self._last_text_time + delay - time.monotonic()) > 0:
+                await asyncio.sleep(remaining)
+            self._flush_text()
             self.console.print()  # newline so status doesn't overwrite text
             self._show_status("Pondering...")
 
         self._pondering_task = asyncio.create_task(show_pondering())
 
+    def _write_text(self, text: str) -> None:
+        """Buffer streamed text, writing it out on newline or every 30 ms."""
+        self._text_buf.append(text)
+        if "\n" in text or time.monotonic() - self._last_text_flush > _TEXT_FLUSH_INTERVAL:
+            self._flush_text()
+        elif self._text_flush_handle is None:
+            # Make sure a trailing chunk shows up even if the stream pauses
+            self._text_flush_handle = asyncio.get_running_loop().call_later(
+                _TEXT_FLUSH_INTERVAL, self._flush_text
+            )
+
+    def _flush_text(self) -> None:
+        """Write buffered text straight to the console's file.
+
+        Streamed text is plain, so this skips Rich's markup parsing (which
+        would also swallow things like "[foo]" in model output).
+        """
+        if self._text_flush_handle:
+            self._text_flush_handle.cancel()
+            self._text_flush_handle = None
+        if self._text_buf:
+            self.console.file.write("".join(self._text_buf))
+            self.console.file.flush()
+            self._text_buf.clear()
+        self._last_text_flush = time.monotonic()
+
     def _show_status(self, message: str) -> None:
         """Show a spinner with the given message."""
-        if self._status:
-            self._status.stop()
-        self._status = Status(message, console=self.console, spinner="dots")
-        self._status.start()
+        self._flush_text()  # the spinner would overwrite pending text
+        # One Status is reused: changing the message updates it in place
+        # instead of tearing down and recreating the live display
+        if self._status is None:
+            self._status = Status(message, console=self.console, spinner="dots")
+        else:
+            self._status.update(message)
+        if not self._status_visible:
+            self._status.start()
+            self._status_visible = True
 
     def _hide_status(self) -> None:
-        """Hide the current spinner if any."""
-        if self._status:
+        """Hide the spinner if it is showing."""
+        if self._status_visible:
             self._status.stop()
-            self._status = None
+            self._status_visible = False
+
+    def _trim_history(self) -> None:
+        """Drop old messages so at most max_history_messages are sent.
+
+        The first user message is kept for context. The kept tail starts at
+        an assistant message, so roles still alternate and tool results
+        stay with the assistant message that requested them.
+        """
+        limit = self.max_history_messages
+        if limit is None or len(self.messages) <= limit:
+            return
+        for cut in range(len(self.messages) - limit + 1, len(self.messages)):
+            if self.messages[cut].role == "assistant":
+                del self.messages[1:cut]
+                return
 
     async def chat(self, user_input: str) -> bool:
         """Process a user message and stream the response.
@@ -145,31 +235,28 @@ class Agent:
                 return False
 
             self.turns += 1
+            self._trim_history()
 
             # Stream response from LLM
-            response_text = ""
+            response_parts: list[str] = []
             tool_calls = []
             stop_reason = None
 
             # Show spinner while waiting for response
             self._show_status("Answering...")
 
-            async for event in self.provider.stream(
-                self.messages,
-                self.tools,
-                system=self.system_prompt,
-            ):
+            async for event in self._stream(self.messages):
                 if event.text:
-                    self._cancel_pondering()
                     self._hide_status()
-                    self.console.print(event.text, end="")
-                    response_text += event.text
+                    self._write_text(event.text)
+                    response_parts.append(event.text)
                     # Schedule "Pondering..." to show after a pause
                     self._schedule_pondering()
 
                 if event.tool_use_started or event.tool_calls:
                     self._cancel_pondering()
                     self._hide_status()
+                    self._flush_text()
                     self.console.print()  # newline so status doesn't overwrite text
                     if event.tool_calls:
                         tool_calls = event.tool_calls
@@ -185,6 +272,8 @@ class Agent:
 
             self._cancel_pondering()
             self._hide_status()
+            self._flush_text()
+            response_text = "".join(response_parts)
             if response_text:
                 self.console.print()
 
@@ -195,50 +284,106 @@ class Agent:
             if not tool_calls:
                 break
 
-            # Execute tool calls
+            # Check permissions for the whole batch up front, while no spinner
+            # is showing; identical calls are only prompted for once
+            to_check = [
+                (tool, call) for call in tool_calls
+                if (tool := self.tools_by_name.get(call.name))
+                and call.name not in self._always_allow
+            ]
+            denied = {
+                id(call)
+                for (_, call), ok in zip(to_check, self.permissions.check_batch(to_check))
+                if not ok
+            }
+
+            # Validate tool calls
             self._show_status("Working...")
-            results = []
-            for call in tool_calls:
+            results: list[ToolResult | None] = [None] * len(tool_calls)
+            runnable = {}  # key -> (tool, call, indices) for calls that passed checks
+            mutations = 0  # non-idempotent calls so far, see below
+            for i, call in enumerate(tool_calls):
                 tool = self.tools_by_name.get(call.name)
                 if not tool:
-                    results.append(ToolResult(
+                    results[i] = ToolResult(
                         tool_call_id=call.id,
                         content=f"[error: unknown tool '{call.name}']",
                         is_error=True,
-                    ))
+                    )
                     continue
 
-                # Check permissions (hide spinner for potential dialog)
-                self._hide_status()
-                if not self.permissions.check(tool, call):
-                    results.append(ToolResult(
+                if id(call) in denied:
+                    results[i] = ToolResult(
                         tool_call_id=call.id,
                         content="[permission denied by user]",
                         is_error=True,
-                    ))
+                    )
                     continue
 
                 # Show execution info
                 self._show_tool_execution(tool, call)
 
                 # Validate required arguments
-                required = tool.parameters.get("required", [])
-                missing = [arg for arg in required if arg not in call.args]
+                missing = [arg for arg in tool.required_args if arg not in call.args]
                 if missing:
-                    results.append(ToolResult(
+                    results[i] = ToolResult(
                         tool_call_id=call.id,
                         content=f"[error: missing required arguments: {', '.join(missing)}]",
                         is_error=True,
-                    ))
+                    )
                     continue
 
-                # Execute tool
+                # Identical calls to an idempotent tool in one turn run once,
+                # unless a call that may change state came between them
+                if tool.idempotent:
+                    key = (call.name, json.dumps(call.args, sort_keys=True, default=str), mutations)
+                else:
+                    key = i
+                    mutations += 1
+                if key in runnable:
+                    runnable[key][2].append(i)
+                else:
+                    runnable[key] = (tool, call, [i])
+
+            # Execute allowed tools (see Tool.aexecute), showing each result
+            # as soon as it completes. Idempotent calls run concurrently with
+            # each other; any other call may change state, so it waits for
+            # every call issued before it, and calls issued after it wait for
+            # it. Results are still sent back together: providers require
+            # every tool call of a turn to be answered in the next message.
+            async def run(
+                tool: Tool, call: ToolCall, indices: list[int], after: list[asyncio.Task]
+            ) -> tuple[ToolCall, list[int], str]:
+                if after:
+                    await asyncio.wait(after)
+                return call, indices, await tool.aexecute(**call.args)
+
+            tasks = []
+            last_mutation: list[asyncio.Task] = []  # at most one task
+            since_mutation: list[asyncio.Task] = []  # idempotent calls after it
+            for tool, call, indices in runnable.values():
+                if tool.idempotent:
+                    task = asyncio.ensure_future(run(tool, call, indices, last_mutation))
+                    since_mutation.append(task)
+                else:
+                    task = asyncio.ensure_future(
+                        run(tool, call, indices, last_mutation + since_mutation)
+                    )
+                    last_mutation, since_mutation = [task], []
+                tasks.append(task)
+
+            remaining = len(runnable)
+            if remaining:
                 self._show_status("Executing...")
-                result = tool.execute(**call.args)
+            for done in asyncio.as_completed(tasks):
+                call, indices, result = await done
                 self._hide_status()
-
-                results.append(ToolResult(tool_call_id=call.id, content=result))
-                self._show_tool_result(result)
+                for i in indices:
+                    results[i] = ToolResult(tool_call_id=tool_calls[i].id, content=result)
+                self._show_tool_result(result, title=call.name if len(runnable) > 1 else None)
+                remaining -= 1
+                if remaining:
+                    self._show_status(f"Executing... ({remaining} remaining)")
 
             # Add results and continue the loop
             self.messages.append(Message.tool_result(results))
@@ -246,10 +391,10 @@ class Agent:
         return True
 
     def _truncate(self, text: str, limit: int = 10) -> str:
-        """Truncate multi-line text, returning (display, was_truncated)."""
-        lines = text.split("\n")
-        if len(lines) > limit:
-            return "\n".join(lines[:limit]) + f"\n... ({len(lines) - limit} more lines)"
+        """Truncate multi-line text to `limit` lines."""
+        head, more = _head_lines(text, limit)
+        if more:
+            return head + f"\n... ({more} more lines)"
         return text
 
     def _show_tool_execution(self, tool: Tool, call) -> None:
@@ -259,26 +404,27 @@ class Agent:
             if isinstance(v, str) and "\n" in v:
                 panels.append((k, v))
             else:
-                r = repr(v)
-                inline.append(f"{k}={r[:60]}..." if len(r) > 60 else f"{k}={r}")
+                inline.append(f"{k}={short_repr(v, 60)}")
 
         self.console.print(f"\n[dim]▶ {tool.name}({', '.join(inline)})[/dim]")
         for name, content in panels:
             self.console.print(Panel(
                 rich_escape(self._truncate(content)),
                 title=f"[dim]{name}[/dim]", title_align="left",
-                border_style="dim", padding=(0, 1),
+                **_PANEL_STYLE,
             ))
 
-    def _show_tool_result(self, result: str) -> None:
+    def _show_tool_result(self, result: str, title: str | None = None) -> None:
         """Display a tool result (truncated if long)."""
-        result = rich_escape(result)  # prevent [text] from being parsed as markup
-        lines = result.split("\n")
-        if len(lines) > 10:
-            display = "\n".join(lines[:10]) + f"\n[dim]... ({len(lines) - 10} more lines)[/dim]"
-        else:
-            display = result
-        self.console.print(Panel(display, border_style="dim", padding=(0, 1)))
+        head, more = _head_lines(result, 10)
+        display = rich_escape(head)  # prevent [text] from being parsed as markup
+        if more:
+            display += f"\n[dim]... ({more} more lines)[/dim]"
+        self.console.print(Panel(
+            display,
+            title=f"[dim]{title}[/dim]" if title else None, title_align="left",
+            **_PANEL_STYLE,
+        ))
 
 
 async def run_agent(
@@ -289,9 +435,10 @@ async def run_agent(
     hooks: list | None = None,
     max_turns: int | None = None,
     stats_file: str | None = None,
+    max_history: int | None = None,
 ):
     """Run the interactive agent loop."""
-    console = Console()
+    console = SHARED_CONSOLE
 
     # Build provider-specific kwargs
     provider_kwargs = {"model_id": model}
@@ -306,34 +453,30 @@ async def run_agent(
 
     llm = create_provider(provider, **provider_kwargs)
 
-    # Get tools from hooks (if any) and merge with defaults
+    # Merge hook settings into the defaults in a single pass over the hooks.
     # Hook modules can define: TOOLS, REMOVE_TOOLS, PATH_BASED,
     # AUTO_ALLOW_CWD, AUTO_ALLOW, REJECT_PROMPTS
-    tools = get_default_tools()
-    hooks = hooks or []
-    for hook in hooks:
-        if hasattr(hook, "TOOLS"):
-            tools = tools + hook.TOOLS
-        if hasattr(hook, "REMOVE_TOOLS"):
-            remove = hook.REMOVE_TOOLS
-            tools = [t for t in tools if t.name not in remove]
-
-    # Build permission manager with hook overrides
     from henri.permissions import DEFAULT_PATH_BASED, DEFAULT_AUTO_ALLOW_CWD, DEFAULT_AUTO_ALLOW
+    tools_by_name = {t.name: t for t in get_default_tools()}
     path_based = set(DEFAULT_PATH_BASED)
     auto_allow_cwd = set(DEFAULT_AUTO_ALLOW_CWD)
     auto_allow = set(DEFAULT_AUTO_ALLOW)
-
     reject_prompts = False
+
+    hooks = hooks or []
     for hook in hooks:
-        if hasattr(hook, "PATH_BASED"):
-            path_based |= hook.PATH_BASED
-        if hasattr(hook, "AUTO_ALLOW_CWD"):
-            auto_allow_cwd |= hook.AUTO_ALLOW_CWD
-        if hasattr(hook, "AUTO_ALLOW"):
-            auto_allow |= hook.AUTO_ALLOW
-        if hasattr(hook, "REJECT_PROMPTS"):
-            reject_prompts = reject_prompts or hook.REJECT_PROMPTS
+        for t in getattr(hook, "TOOLS", ()):
+            tools_by_name[t.name] = t
+        for name in getattr(hook, "REMOVE_TOOLS", ()):
+            tools_by_name.pop(name, None)
+        for attr, target in (
+            ("PATH_BASED", path_based),
+            ("AUTO_ALLOW_CWD", auto_allow_cwd),
+            ("AUTO_ALLOW", auto_allow),
+        ):
+            target.update(getattr(hook, attr, ()))
+        reject_prompts = reject_prompts or getattr(hook, "REJECT_PROMPTS", False)
+    tools = list(tools_by_name.values())
 
     permissions = PermissionManager(
         console=console,
@@ -348,6 +491,7 @@ async def run_agent(
         console=console,
         permissions=permissions,
         max_turns=max_turns,
+        max_history_messages=max_history,
     )
 
     console.print(Panel(
@@ -357,45 +501,48 @@ async def run_agent(
         border_style="blue",
     ))
 
-    # Print tools and permissions summary
-    tool_lines, perm_lines = summarize_tools_and_permissions(
-        tools, auto_allow_cwd, auto_allow, reject_prompts
-    )
+    # Print tools and permissions summary (the same one the system prompt uses)
     console.print("\n[bold]Tools:[/bold]")
-    for line in tool_lines:
+    for line in agent.tool_lines:
         console.print(line)
     console.print("\n[bold]Permissions:[/bold]")
-    for line in perm_lines:
+    for line in agent.perm_lines:
         console.print(f"  {line}")
 
     # Use prompt_toolkit only for interactive terminals
     interactive = sys.stdin.isatty()
-    session = PromptSession(history=FileHistory(os.path.expanduser("~/.henri_history"))) if interactive else None
+    history = WriteBehindFileHistory(os.path.expanduser("~/.henri_history")) if interactive else None
+    session = PromptSession(history=history) if interactive else None
 
-    while True:
-        try:
-            console.print()
-            if interactive:
-                user_input = await session.prompt_async("> ")
-            else:
-                user_input = sys.stdin.readline()
-                if not user_input:  # EOF
-                    break
-            if not user_input.strip():
-                continue
-            await agent.chat(user_input)
-        except KeyboardInterrupt:
-            console.print("\n[dim]Goodbye![/dim]")
-            break
-        except EOFError:
-            break
+    try:
+        while True:
+            try:
+                console.print()
+                if interactive:
+                    user_input = await session.prompt_async("> ")
+                else:
+                    # Read off the event loop so background tasks keep running
+                    user_input = await asyncio.to_thread(sys.stdin.readline)
+                    if not user_input:  # EOF
+                        break
+                if not user_input.strip():
+                    continue
+                await agent.chat(user_input)
+            except KeyboardInterrupt:
+                console.print("\n[dim]Goodbye![/dim]")
+                break
+            except EOFError:
+                break
+    finally:
+        # Also on errors, so queued prompts still reach the history file
+        if history:
+            history.close()
 
     # Print metrics
     console.print(f"\n[dim]Turns: {agent.turns} | Tokens: {agent.input_tokens} in, {agent.output_tokens} out[/dim]")
 
     # Write stats to file if requested
     if stats_file:
-        import json
         stats = {
             "turns": agent.turns,
             "input_tokens": agent.input_tokens,
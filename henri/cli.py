@@ -6,8 +6,8 @@ import importlib.util
 import sys
 from pathlib import Path
 
-from henri.agent import run_agent
 from henri.config import (
+    PROVIDER_NAMES,
     DEFAULT_PROVIDER,
     DEFAULT_BEDROCK_MODEL,
     DEFAULT_GOOGLE_MODEL,
@@ -15,7 +15,6 @@ from henri.config import (
     DEFAULT_OLLAMA_HOST,
     DEFAULT_VERTEX_MODEL,
 )
-from henri.providers import PROVIDERS
 
 
 def load_hook(hook_path: str):
@@ -39,7 +38,7 @@ def main():
     )
     parser.add_argument(
         "--provider", "-p",
-        choices=list(PROVIDERS.keys()),
+        choices=PROVIDER_NAMES,
         default=DEFAULT_PROVIDER,
         help=f"LLM provider (default: {DEFAULT_PROVIDER})",
     )
@@ -66,6 +65,12 @@ def main():
         default=None,
         help="Maximum conversation turns (default: unlimited)",
     )
+    parser.add_argument(
+        "--max-history",
+        type=int,
+        default=None,
+        help="Maximum messages sent to the LLM per turn, at least 3; older ones are dropped (default: unlimited)",
+    )
     parser.add_argument(
         "--stats-file",
         type=str,
@@ -74,6 +79,11 @@ def main():
     )
     args = parser.parse_args()
 
+    # The kept history is the first user message plus at least one
+    # assistant message and its reply, so fewer than 3 can never be met
+    if args.max_history is not None and args.max_history < 3:
+        parser.error("--max-history must be at least 3")
+
     # Validate openai_compatible provider requirements
     if args.provider == "openai_compatible":
         if args.model is None:
@@ -100,6 +110,10 @@ def main():
         for hook_path in args.hook:
             hooks.append(load_hook(hook_path))
 
+    # Imported late: the agent pulls in prompt_toolkit, Rich and every
+    # provider SDK, which --help and argument errors don't need
+    from henri.agent import run_agent
+
     asyncio.run(run_agent(
         provider=args.provider,
         model=args.model,
@@ -108,6 +122,7 @@ def main():
         hooks=hooks,
         max_turns=args.max_turns,
         stats_file=args.stats_file,
+        max_history=args.max_history,
     ))
 
 
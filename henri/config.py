@@ -3,6 +3,10 @@
 # Default provider
 DEFAULT_PROVIDER = "bedrock"
 
+# Provider names, matching henri.providers.PROVIDERS. Kept here so the CLI
+# can validate --provider without importing every provider SDK.
+PROVIDER_NAMES = ("bedrock", "google", "ollama", "openai_compatible", "vertex")
+
 # AWS Bedrock defaults
 DEFAULT_BEDROCK_MODEL = "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
 DEFAULT_BEDROCK_REGION = "us-east-1"
@@ -0,0 +1,61 @@
+"""Prompt history that is written to disk in the background."""
+
+import asyncio
+import datetime
+
+from prompt_toolkit.history import FileHistory
+
+
+class WriteBehindFileHistory(FileHistory):
+    """FileHistory that batches appends instead of writing on every prompt.
+
+    New entries are queued and appended to the file by a background task
+    every `interval` seconds, in the same format as FileHistory. Call
+    close() before exiting to write anything still pending.
+    """
+
+    def __init__(self, filename: str, interval: float = 0.5):
+        super().__init__(filename)
+        self.interval = interval
+        self._pending: list[str] = []
+        self._writer: asyncio.Task | None = None
+
+    def store_string(self, string: str) -> None:
+        lines = "".join(f"+{line}\n" for line in string.split("\n"))
+        self._pending.append(f"\n# {datetime.datetime.now()}\n{lines}")
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no event loop: write synchronously
+            self._append(self._take_pending())
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._write_later())
+
+    async def _write_later(self) -> None:
+        """Wait for more entries to accumulate, then append them off-loop.
+
+        Repeats while entries keep arriving, including during a write, since
+        store_string() only starts a writer when none is running.
+        """
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self._append, self._take_pending())
+
+    def _take_pending(self) -> str:
+        """Return all pending entries as one string and clear the queue."""
+        data = "".join(self._pending)
+        self._pending.clear()
+        return data
+
+    def _append(self, data: str) -> None:
+        """Append already formatted entries to the history file."""
+        if data:
+            with open(self.filename, "ab") as f:
+                f.write(data.encode("utf-8"))
+
+    def close(self) -> None:
+        """Stop the background writer and write any pending entries."""
+        if self._writer and not self._writer.done():
+            self._writer.cancel()
+        self._append(self._take_pending())
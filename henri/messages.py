@@ -1,20 +1,42 @@
 """Core message types for Henri."""
 
+import json
+import sys
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Any, Literal
+
+import orjson
 
 Role = Literal["user", "assistant", "tool"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """A request from the LLM to execute a tool."""
     id: str
     name: str
     args: dict
+    _args_json: str | None = field(default=None, init=False, repr=False, compare=False)
+    _perm_key: str | None = field(default=None, init=False, repr=False, compare=False)  # see PermissionManager
+
+    def __post_init__(self):
+        # Names parsed from provider responses are fresh strings; interning
+        # makes lookups against the (literal, already interned) tool names
+        # succeed on the identity check.
+        self.name = sys.intern(self.name)
+
+    @property
+    def args_json(self) -> str:
+        """The arguments encoded as JSON, computed once and reused."""
+        if self._args_json is None:
+            try:
+                self._args_json = orjson.dumps(self.args).decode()
+            except TypeError:  # e.g. an integer beyond 64 bits
+                self._args_json = json.dumps(self.args)
+        return self._args_json
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """The result of executing a tool."""
     tool_call_id: str
@@ -22,13 +44,16 @@ class ToolResult:
     is_error: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """A message in the conversation."""
     role: Role
     content: str = ""
-    tool_calls: list[ToolCall] = field(default_factory=list)
-    tool_results: list[ToolResult] = field(default_factory=list)
+    # Tuples: messages are never modified, and an empty tuple is shared
+    tool_calls: tuple[ToolCall, ...] = ()
+    tool_results: tuple[ToolResult, ...] = ()
+    # Provider name -> this message converted to that provider's format
+    _provider_cache: dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     @classmethod
     def user(cls, content: str) -> "Message":
@@ -36,8 +61,8 @@ class Message:
 
     @classmethod
     def assistant(cls, content: str = "", tool_calls: list[ToolCall] | None = None) -> "Message":
-        return cls(role="assistant", content=content, tool_calls=tool_calls or [])
+        return cls(role="assistant", content=content, tool_calls=tuple(tool_calls or ()))
 
     @classmethod
     def tool_result(cls, results: list[ToolResult]) -> "Message":
-        return cls(role="tool", tool_results=results)
+        return cls(role="tool", tool_results=tuple(results))
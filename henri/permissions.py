@@ -1,19 +1,53 @@
 """Simple permission management for tool execution."""
 
+import json
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from rich.console import Console
+from rich.markup import escape as rich_escape
 from rich.panel import Panel
 
 from henri.messages import ToolCall
 from henri.tools.base import Tool
 
 
-# Default configurations
-DEFAULT_PATH_BASED = {"grep", "glob", "read_file", "write_file", "edit_file"}
-DEFAULT_AUTO_ALLOW_CWD = {"grep", "glob", "read_file"}
-DEFAULT_AUTO_ALLOW = set()
+# Default configurations (frozen, so instances can share them without copying)
+DEFAULT_PATH_BASED = frozenset({"grep", "glob", "read_file", "write_file", "edit_file"})
+DEFAULT_AUTO_ALLOW_CWD = frozenset({"grep", "glob", "read_file"})
+DEFAULT_AUTO_ALLOW = frozenset()
+
+# Console shared by PermissionManagers and the agent unless one is passed in,
+# so the terminal is probed once per process
+SHARED_CONSOLE = Console()
+
+# Maximum repr length of each argument shown in permission prompts
+PROMPT_ARG_LIMIT = 200
+
+# Maximum number of raw path strings remembered by _resolve_path
+RESOLVE_CACHE_SIZE = 1024
+
+
+def _lexical_resolve(path: str, cwd: str) -> str:
+    """Make a path absolute and normalize it without touching the filesystem.
+
+    Unlike Path.resolve() this does not follow symlinks, so "link/.." is
+    collapsed textually and a symlink inside cwd is treated as inside.
+    """
+    return os.path.normpath(os.path.join(cwd, os.path.expanduser(path)))
+
+
+def short_repr(value, limit: int) -> str:
+    """Return repr(value) cut to `limit` characters plus '...' if longer.
+
+    Long strings are cut before repr() so a huge argument is not escaped
+    in full only to be thrown away.
+    """
+    if isinstance(value, str) and len(value) > limit:
+        value = value[:limit]
+    r = repr(value)
+    return f"{r[:limit]}..." if len(r) > limit else r
 
 
 @dataclass
@@ -21,22 +55,18 @@ class PermissionManager:
     """Manages permissions for tool execution."""
 
     # Configuration: tools where "always" means per-path
-    path_based: set[str] = field(default_factory=lambda: set(DEFAULT_PATH_BASED))
+    path_based: frozenset[str] | set[str] = DEFAULT_PATH_BASED
 
     # Configuration: path-based tools that auto-allow within cwd
-    auto_allow_cwd: set[str] = field(default_factory=lambda: set(DEFAULT_AUTO_ALLOW_CWD))
+    auto_allow_cwd: frozenset[str] | set[str] = DEFAULT_AUTO_ALLOW_CWD
 
     # Configuration: tools that are always allowed (no prompts)
-    auto_allow: set[str] = field(default_factory=lambda: set(DEFAULT_AUTO_ALLOW))
-
-    # Session state: tools that have been permanently allowed
-    allowed_tools: set[str] = field(default_factory=set)
+    auto_allow: frozenset[str] | set[str] = DEFAULT_AUTO_ALLOW
 
-    # Session state: exact bash commands that have been allowed
-    allowed_bash_commands: set[str] = field(default_factory=set)
-
-    # Session state: paths that have been allowed, per tool
-    allowed_paths: dict[str, set[str]] = field(default_factory=dict)
+    # Session state: calls allowed with "always", as permission keys: the
+    # exact bash command, the resolved path for path-based tools, or just
+    # the tool name (see _permission_key)
+    allowed_keys: set[str] = field(default_factory=set)
 
     # Session state: allow all tools without prompting
     allow_all: bool = False
@@ -44,7 +74,26 @@ class PermissionManager:
     # If True, reject (instead of prompting) when permission needed
     reject_prompts: bool = False
 
-    console: Console = field(default_factory=Console)
+    # If False, normalize paths lexically instead of resolving symlinks.
+    # Faster (no syscalls), but a symlink in cwd pointing elsewhere then
+    # counts as inside cwd, so only disable this for trusted trees.
+    resolve_symlinks: bool = True
+
+    console: Console = field(default_factory=lambda: SHARED_CONSOLE)
+
+    # Cached resolved cwd and the same with a trailing separator (see
+    # refresh_cwd)
+    _cwd_resolved: str | None = field(default=None, init=False, repr=False)
+    _cwd_prefix: str = field(default="", init=False, repr=False)
+
+    # Raw path -> resolved path, kept only for the duration of a
+    # check_batch(): once tools run, a symlink may point somewhere else
+    _resolved_paths: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _in_batch: bool = field(default=False, init=False, repr=False)
+
+    # "<tool>\0<raw path>" for calls already found allowed in the current
+    # check_batch (skips resolving); cleared with _resolved_paths
+    _allowed_raw_paths: set[str] = field(default_factory=set, init=False, repr=False)
 
     def _is_path_based(self, tool_name: str) -> bool:
         """Check if a tool uses per-path permission tracking."""
@@ -59,17 +108,52 @@ class PermissionManager:
         return tool_name in self.auto_allow
 
     def _resolve_path(self, path: str) -> str:
-        """Resolve a path to absolute, expanding ~ and symlinks."""
-        return str(Path(path).expanduser().resolve())
+        """Resolve a path to absolute, expanding ~ and symlinks.
+
+        Within a check_batch() results are memoized by the raw string, since
+        a batch often names the same path repeatedly and resolve() stats
+        every component.
+        """
+        resolved = self._resolved_paths.get(path)
+        if resolved is None:
+            if len(self._resolved_paths) >= RESOLVE_CACHE_SIZE:
+                self._resolved_paths.clear()
+            if self.resolve_symlinks:
+                try:
+                    resolved = str(Path(path).expanduser().resolve())
+                except (ValueError, OSError, RuntimeError):
+                    # Unresolvable (NUL byte, symlink loop): opening it fails
+                    # too, so the lexical form is good enough
+                    resolved = _lexical_resolve(path, self._cwd())
+            else:
+                resolved = _lexical_resolve(path, self._cwd())
+            if self._in_batch:
+                self._resolved_paths[path] = resolved
+        return resolved
+
+    def refresh_cwd(self) -> None:
+        """Forget cached cwd and resolved paths, e.g. after os.chdir()."""
+        self._cwd_resolved = None
+        self._resolved_paths.clear()
+        self._allowed_raw_paths.clear()
+
+    def _cwd(self) -> str:
+        """Return the resolved cwd, computed once and cached."""
+        if self._cwd_resolved is None:
+            cwd = str(Path.cwd().resolve())
+            self._cwd_resolved = cwd
+            self._cwd_prefix = cwd if cwd.endswith(os.sep) else cwd + os.sep
+        return self._cwd_resolved
 
     def _is_path_within_cwd(self, path: str) -> bool:
-        """Check if a path is within the current working directory."""
-        try:
-            resolved = Path(self._resolve_path(path))
-            cwd = Path.cwd().resolve()
-            return resolved.is_relative_to(cwd)
-        except (ValueError, OSError):
-            return False
+        """Check if a path is within the current working directory.
+
+        Resolved paths are absolute and normalized (by resolve() or
+        _lexical_resolve), so containment is a plain string prefix test.
+        """
+        resolved = self._resolve_path(path)
+        cwd = self._cwd()
+        return resolved == cwd or resolved.startswith(self._cwd_prefix)
 
     def check(self, tool: Tool, call: ToolCall) -> bool:
         """Check if a tool call is allowed. Prompts user if needed."""
@@ -83,22 +167,24 @@ class PermissionManager:
         if self._is_auto_allow(tool.name):
             return True
 
-        # For bash, check exact command match
-        if tool.name == "bash":
-            command = call.args.get("command", "")
-            if command in self.allowed_bash_commands:
-                return True
-        # For path-based tools
-        elif self._is_path_based(tool.name):
+        path_based = self._is_path_based(tool.name)
+        if path_based:
             path = call.args.get("path", ".")
-            resolved = self._resolve_path(path)
-            # Check if path already allowed for this tool
-            if resolved in self.allowed_paths.get(tool.name, set()):
+            # Same raw path as an earlier allowed call: no need to resolve
+            raw_key = f"{tool.name}\0{path}"
+            if raw_key in self._allowed_raw_paths:
                 return True
+
+        # Remembered "always" answer for this command, path or tool
+        allowed = self._permission_key(tool, call) in self.allowed_keys
+        if path_based:
             # Auto-allow within cwd only for certain tools
-            if self._is_auto_allow_cwd(tool.name) and self._is_path_within_cwd(path):
-                return True
-        elif tool.name in self.allowed_tools:
+            allowed = allowed or (
+                self._is_auto_allow_cwd(tool.name) and self._is_path_within_cwd(path)
+            )
+            if allowed and self._in_batch:
+                self._allowed_raw_paths.add(raw_key)
+        if allowed:
             return True
 
         if self.reject_prompts:
@@ -107,10 +193,56 @@ class PermissionManager:
 
         return self._prompt_user(tool, call)
 
+    def check_batch(self, pairs: list[tuple[Tool, ToolCall]]) -> list[bool]:
+        """Check several tool calls, returning one result per pair in order.
+
+        Identical calls (same tool and same arguments) are checked, and
+        prompted for, only once. Any other call is checked on its own, so
+        only an "always" answer carries over to it.
+        """
+        decisions: dict[tuple[str, str], bool] = {}
+        results = []
+        self._in_batch = True
+        try:
+            for tool, call in pairs:
+                key = (tool.name, json.dumps(call.args, sort_keys=True, default=str))
+                if key not in decisions:
+                    decisions[key] = self.check(tool, call)
+                results.append(decisions[key])
+        finally:
+            self._in_batch = False
+            self._resolved_paths.clear()
+            self._allowed_raw_paths.clear()
+        return results
+
+    def _permission_key(self, tool: Tool, call: ToolCall) -> str:
+        """Return the key an "always" answer for this call is stored under.
+
+        Computed once per call and cached on the ToolCall.
+        """
+        if call._perm_key is None:
+            if tool.name == "bash":
+                call._perm_key = f"bash\0{call.args.get('command', '')}"
+            elif self._is_path_based(tool.name):
+                call._perm_key = f"{tool.name}\0{self._resolve_path(call.args.get('path', '.'))}"
+            else:
+                call._perm_key = tool.name
+        return call._perm_key
+
     def _prompt_user(self, tool: Tool, call: ToolCall) -> bool:
         """Prompt the user for permission to execute a tool."""
-        # Format the tool call nicely
-        args_display = "\n".join(f"  {k}: {v!r}" for k, v in call.args.items())
+        # Format the tool call nicely. Long values are shortened, except the
+        # argument that "always" would remember, which is shown in full.
+        if tool.name == "bash":
+            full = "command"
+        elif self._is_path_based(tool.name):
+            full = "path"
+        else:
+            full = None
+        args_display = rich_escape("\n".join(
+            f"  {k}: {v!r}" if k == full else f"  {k}: {short_repr(v, PROMPT_ARG_LIMIT)}"
+            for k, v in call.args.items()
+        ))
 
         self.console.print()
         self.console.print(Panel(
@@ -143,19 +275,13 @@ class PermissionManager:
             elif response in ("n", "no"):
                 return False
             elif response in ("a", "always"):
+                self.allowed_keys.add(self._permission_key(tool, call))
                 if tool.name == "bash":
-                    command = call.args.get("command", "")
-                    self.allowed_bash_commands.add(command)
                     self.console.print(f"[dim]Will allow this exact bash command for this session[/dim]")
                 elif self._is_path_based(tool.name):
-                    path = call.args.get("path", ".")
-                    resolved = self._resolve_path(path)
-                    if tool.name not in self.allowed_paths:
-                        self.allowed_paths[tool.name] = set()
-                    self.allowed_paths[tool.name].add(resolved)
+                    resolved = self._resolve_path(call.args.get("path", "."))
                     self.console.print(f"[dim]Will allow {tool.name} access to '{resolved}' for this session[/dim]")
                 else:
-                    self.allowed_tools.add(tool.name)
                     self.console.print(f"[dim]Will allow '{tool.name}' for this session[/dim]")
                 return True
             else:
@@ -9,7 +9,7 @@ from .ollama import OllamaProvider
 from .openai_compatible import OpenAICompatibleProvider
 from .vertex import VertexProvider
 
-# Registry of available providers
+# Registry of available providers (keep henri.config.PROVIDER_NAMES in sync)
 PROVIDERS: dict[str, type[Provider]] = {
     "bedrock": BedrockProvider,
     "google": GoogleProvider,
@@ -0,0 +1,82 @@
+"""Incremental tracking of streamed tool-call JSON."""
+
+import re
+
+import orjson
+
+# Characters that can change the parser state
+_SPECIAL = re.compile(r'["\\{}\[\]]')
+
+_OPENERS = frozenset("{[")
+
+
+class IncrementalJsonParser:
+    """Follow the structure of a JSON object as it arrives in chunks.
+
+    Each feed() scans only the new chunk, tracking open brackets and
+    string/escape state, so `complete` is known at any point without
+    rescanning what came before. try_finalize() decodes the result once
+    it is complete.
+    """
+
+    __slots__ = ("_chunks", "_stack", "_in_string", "_escaped", "_opened")
+
+    def __init__(self):
+        self._chunks: list[str] = []
+        self._stack: list[str] = []  # open "{" and "["
+        self._in_string = False
+        self._escaped = False  # previous chunk ended in a backslash
+        self._opened = False
+
+    def feed(self, chunk: str) -> None:
+        """Add the next piece of the JSON text."""
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        stack = self._stack
+        in_string = self._in_string
+        skip = 0 if self._escaped else -1  # position of an escaped character
+        for m in _SPECIAL.finditer(chunk):
+            pos = m.start()
+            if pos == skip:
+                continue
+            c = m.group()
+            if in_string:
+                if c == "\\":
+                    skip = pos + 1
+                elif c == '"':
+                    in_string = False
+            elif c == '"':
+                in_string = True
+            elif c in _OPENERS:
+                stack.append(c)
+                self._opened = True
+            elif stack:  # "}" or "]"
+                stack.pop()
+        self._in_string = in_string
+        self._escaped = skip == len(chunk)
+
+    @property
+    def complete(self) -> bool:
+        """Whether a top-level value has been opened and closed."""
+        return self._opened and not self._stack and not self._in_string
+
+    def try_finalize(self) -> dict | None:
+        """Decode the text fed so far as a JSON object.
+
+        Returns {} for empty input and None if the text cannot be decoded.
+        A stream that stopped before its top-level object was closed also
+        gives None, rather than closing it: any cut-off string, number,
+        array or object in it may be missing values, and a tool must not
+        run on silently shortened arguments.
+        """
+        text = "".join(self._chunks)
+        if not text.strip():
+            return {}
+        if not self.complete:
+            return None
+        try:
+            value = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
@@ -1,9 +1,10 @@
 """Base provider protocol for LLM backends."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from henri.tools.base import Tool
@@ -28,11 +29,79 @@ class StreamEvent:
     usage: Usage | None = None  # Token usage (typically at end of response)
 
 
+async def coalesce_text(
+    events: AsyncIterator[StreamEvent],
+    min_chars: int = 64,
+    max_delay: float = 0.02,
+) -> AsyncIterator[StreamEvent]:
+    """Merge runs of small text events into fewer, larger ones.
+
+    Text is held until at least `min_chars` characters have arrived or
+    `max_delay` seconds have passed since the first held chunk, so a slow
+    stream still appears promptly. Any other event flushes held text first,
+    keeping the order of events unchanged.
+    """
+    loop = asyncio.get_running_loop()
+    it = aiter(events)
+    held: list[str] = []
+    held_chars = 0
+    deadline = 0.0
+    # The pending read is never cancelled on timeout: cancelling __anext__
+    # would close the underlying stream.
+    pending: asyncio.Future | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(it))
+            timeout = max(0.0, deadline - loop.time()) if held else None
+            done, _ = await asyncio.wait((pending,), timeout=timeout)
+            if not done:
+                yield StreamEvent(text="".join(held))
+                held.clear()
+                held_chars = 0
+                continue
+
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            if event.text and not (
+                event.tool_calls or event.tool_use_started or event.stop_reason or event.usage
+            ):
+                if not held:
+                    deadline = loop.time() + max_delay
+                held.append(event.text)
+                held_chars += len(event.text)
+                if held_chars >= min_chars:
+                    yield StreamEvent(text="".join(held))
+                    held.clear()
+                    held_chars = 0
+                continue
+
+            if held:
+                yield StreamEvent(text="".join(held))
+                held.clear()
+                held_chars = 0
+            yield event
+
+        if held:
+            yield StreamEvent(text="".join(held))
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
 class Provider(ABC):
     """Abstract base class for LLM providers."""
 
     name: str  # Provider identifier, e.g., "bedrock", "google", "ollama"
 
+    # (tools, converted schemas) from the last _cached_tools() call
+    _tools_cache: tuple[tuple["Tool", ...], Any] | None = None
+
     @abstractmethod
     async def stream(
         self,
@@ -51,3 +120,29 @@ class Provider(ABC):
             StreamEvent objects with text chunks, tool calls, and stop reason
         """
         pass
+
+    def refresh_tools(self) -> None:
+        """Drop cached tool schemas, e.g. after a tool's parameters change."""
+        self._tools_cache = None
+
+    def _cached_tools(self, tools: list["Tool"], convert: Callable[[list["Tool"]], Any]) -> Any:
+        """Return convert(tools), reusing the last result while the tools are the same.
+
+        The tool list rarely changes within a session, so this avoids
+        rebuilding the provider's schema format on every turn.
+        """
+        key = tuple(tools)
+        if self._tools_cache is None or self._tools_cache[0] != key:
+            self._tools_cache = (key, convert(tools))
+        return self._tools_cache[1]
+
+    def _cached_message(self, msg: Message, convert: Callable[[Message], Any]) -> Any:
+        """Return convert(msg), computed once per message and provider.
+
+        Messages are never modified, so history converted on earlier turns
+        is reused and only new messages are converted.
+        """
+        cache = msg._provider_cache
+        if self.name not in cache:
+            cache[self.name] = convert(msg)
+        return cache[self.name]
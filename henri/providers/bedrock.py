@@ -1,10 +1,11 @@
 """AWS Bedrock provider for Claude models."""
 
-import json
+import re
 from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING
 
 import boto3
+import orjson
 
 if TYPE_CHECKING:
     from henri.tools.base import Tool
@@ -13,6 +14,14 @@ from henri.config import DEFAULT_BEDROCK_MODEL, DEFAULT_BEDROCK_REGION
 from henri.messages import Message, ToolCall
 from henri.providers.base import Provider, StreamEvent, Usage
 
+# Models that accept cachePoint blocks (prompt caching); Converse rejects
+# requests containing them for any other model. Matches plain model ids,
+# inference profiles ("us.anthropic...") and their ARNs.
+_CACHE_POINT_MODEL = re.compile(
+    r"anthropic\.claude-(?:3-5-haiku|3-5-sonnet-20241022|3-7-|(?:opus|sonnet|haiku)-\d)"
+    r"|amazon\.nova-"
+)
+
 
 class BedrockProvider(Provider):
     """AWS Bedrock provider using the Converse API."""
@@ -26,6 +35,8 @@ class BedrockProvider(Provider):
     ):
         self.model_id = model_id
         self.client = boto3.client("bedrock-runtime", region_name=region)
+        self._system_cache: tuple[str, list[dict]] | None = None
+        self._cache_points = bool(_CACHE_POINT_MODEL.search(model_id))
 
     def _message_to_bedrock(self, msg: Message) -> dict:
         """Convert a Message to Bedrock's format."""
@@ -55,6 +66,20 @@ class BedrockProvider(Provider):
         role = "user" if msg.role == "tool" else msg.role
         return {"role": role, "content": content}
 
+    def _system_to_bedrock(self, system: str) -> list[dict]:
+        """Convert the system prompt to Bedrock blocks.
+
+        The system prompt is identical every turn, so the blocks are built
+        once. For models that support prompt caching they end in a cache
+        point, which lets Bedrock reuse the cached prefix.
+        """
+        if self._system_cache is None or self._system_cache[0] != system:
+            blocks = [{"text": system}]
+            if self._cache_points:
+                blocks.append({"cachePoint": {"type": "default"}})
+            self._system_cache = (system, blocks)
+        return self._system_cache[1]
+
     def _tools_to_bedrock(self, tools: list["Tool"]) -> list[dict]:
         """Convert tools to Bedrock's toolConfig format."""
         return [
@@ -75,7 +100,7 @@ class BedrockProvider(Provider):
         system: str = "",
     ) -> AsyncIterator[StreamEvent]:
         """Stream a response from Claude."""
-        bedrock_messages = [self._message_to_bedrock(m) for m in messages]
+        bedrock_messages = [self._cached_message(m, self._message_to_bedrock) for m in messages]
 
         request = {
             "modelId": self.model_id,
@@ -83,16 +108,16 @@ class BedrockProvider(Provider):
         }
 
         if system:
-            request["system"] = [{"text": system}]
+            request["system"] = self._system_to_bedrock(system)
 
         if tools:
-            request["toolConfig"] = {"tools": self._tools_to_bedrock(tools)}
+            request["toolConfig"] = {"tools": self._cached_tools(tools, self._tools_to_bedrock)}
 
         response = self.client.converse_stream(**request)
 
         current_tool_id = None
         current_tool_name = None
-        current_tool_input = ""
+        current_tool_input: list[str] = []  # JSON chunks, joined at block stop
         tool_calls = []
         usage = None
         stop_reason = None
@@ -103,7 +128,7 @@ class BedrockProvider(Provider):
                 if "toolUse" in start:
                     current_tool_id = start["toolUse"]["toolUseId"]
                     current_tool_name = start["toolUse"]["name"]
-                    current_tool_input = ""
+                    current_tool_input = []
                     # Signal that tool use is starting (for spinner)
                     yield StreamEvent(tool_use_started=True)
 
@@ -112,14 +137,15 @@ class BedrockProvider(Provider):
                 if "text" in delta:
                     yield StreamEvent(text=delta["text"])
                 elif "toolUse" in delta:
-                    current_tool_input += delta["toolUse"].get("input", "")
+                    current_tool_input.append(delta["toolUse"].get("input", ""))
 
             elif "contentBlockStop" in event:
                 if current_tool_id and current_tool_name:
+                    raw_input = "".join(current_tool_input)
                     tool_calls.append(ToolCall(
                         id=current_tool_id,
                         name=current_tool_name,
-                        args=json.loads(current_tool_input) if current_tool_input else {},
+                        args=orjson.loads(raw_input) if raw_input else {},
                     ))
                     current_tool_id = None
                     current_tool_name = None
@@ -130,8 +156,13 @@ class BedrockProvider(Provider):
             elif "metadata" in event:
                 # metadata comes after messageStop
                 u = event["metadata"].get("usage", {})
+                # Cached prompt tokens are reported separately from inputTokens
                 usage = Usage(
-                    input_tokens=u.get("inputTokens", 0),
+                    input_tokens=(
+                        u.get("inputTokens", 0)
+                        + u.get("cacheReadInputTokens", 0)
+                        + u.get("cacheWriteInputTokens", 0)
+                    ),
                     output_tokens=u.get("outputTokens", 0),
                 )
 
@@ -12,7 +12,7 @@ if TYPE_CHECKING:
 
 from henri.config import DEFAULT_GOOGLE_MODEL, DEFAULT_GOOGLE_LOCATION
 from henri.messages import Message, ToolCall
-from henri.providers.base import Provider, StreamEvent, Usage
+from henri.providers.base import Provider, StreamEvent, Usage, coalesce_text
 
 
 class GoogleProvider(Provider):
@@ -33,6 +33,8 @@ class GoogleProvider(Provider):
         location: str = DEFAULT_GOOGLE_LOCATION,
     ):
         self.model_id = model_id
+        # (tool schemas, system prompt, config) from the last request
+        self._config_cache: tuple[list[types.Tool] | None, str, types.GenerateContentConfig] | None = None
 
         # Check for API key first (Google AI API)
         api_key = api_key or os.environ.get("GOOGLE_API_KEY")
@@ -63,47 +65,71 @@ class GoogleProvider(Provider):
             ))
         return [types.Tool(function_declarations=declarations)]
 
-    def _messages_to_google(self, messages: list[Message]) -> list[types.Content]:
-        """Convert messages to Google's Content format."""
-        contents = []
-
-        for msg in messages:
-            parts = []
+    def _message_to_google(self, msg: Message) -> types.Content | None:
+        """Convert a Message to Google's Content format (None if it has no parts)."""
+        parts = []
 
-            if msg.content:
-                parts.append(types.Part.from_text(text=msg.content))
+        if msg.content:
+            parts.append(types.Part.from_text(text=msg.content))
 
-            for tc in msg.tool_calls:
-                parts.append(types.Part.from_function_call(
-                    name=tc.name,
-                    args=tc.args,
-                ))
+        for tc in msg.tool_calls:
+            parts.append(types.Part.from_function_call(
+                name=tc.name,
+                args=tc.args,
+            ))
 
-            for tr in msg.tool_results:
-                parts.append(types.Part.from_function_response(
-                    name=tr.tool_call_id,
-                    response={"result": tr.content},
-                ))
+        for tr in msg.tool_results:
+            parts.append(types.Part.from_function_response(
+                name=tr.tool_call_id,
+                response={"result": tr.content},
+            ))
 
-            if parts:
-                role = "model" if msg.role == "assistant" else "user"
-                contents.append(types.Content(role=role, parts=parts))
+        if not parts:
+            return None
+        role = "model" if msg.role == "assistant" else "user"
+        return types.Content(role=role, parts=parts)
 
+    def _messages_to_google(self, messages: list[Message]) -> list[types.Content]:
+        """Convert messages to Google's Content format, reusing cached conversions."""
+        contents = []
+        for msg in messages:
+            content = self._cached_message(msg, self._message_to_google)
+            if content is not None:
+                contents.append(content)
         return contents
 
+    def _config(self, tools: list["Tool"], system: str) -> types.GenerateContentConfig:
+        """Build the request config, reusing it while tools and system prompt are unchanged."""
+        google_tools = self._cached_tools(tools, self._tools_to_google) if tools else None
+        cached = self._config_cache
+        if cached is None or cached[0] is not google_tools or cached[1] != system:
+            config = types.GenerateContentConfig(
+                system_instruction=system if system else None,
+                tools=google_tools,
+            )
+            self._config_cache = cached = (google_tools, system, config)
+        return cached[2]
+
     async def stream(
         self,
         messages: list[Message],
         tools: list["Tool"],
         system: str = "",
     ) -> AsyncIterator[StreamEvent]:
-        """Stream a response from Gemini."""
+        """Stream a response from Gemini, merging small text chunks."""
+        async for event in coalesce_text(self._stream_events(messages, tools, system)):
+            yield event
+
+    async def _stream_events(
+        self,
+        messages: list[Message],
+        tools: list["Tool"],
+        system: str,
+    ) -> AsyncIterator[StreamEvent]:
+        """Yield one event per chunk received from Gemini."""
         contents = self._messages_to_google(messages)
 
-        config = types.GenerateContentConfig(
-            system_instruction=system if system else None,
-            tools=self._tools_to_google(tools) if tools else None,
-        )
+        config = self._config(tools, system)
 
         tool_calls = []
         usage = None
@@ -10,7 +10,7 @@ if TYPE_CHECKING:
 
 from henri.config import DEFAULT_OLLAMA_MODEL, DEFAULT_OLLAMA_HOST
 from henri.messages import Message, ToolCall
-from henri.providers.base import Provider, StreamEvent, Usage
+from henri.providers.base import Provider, StreamEvent, Usage, coalesce_text
 
 
 class OllamaProvider(Provider):
@@ -40,39 +40,47 @@ class OllamaProvider(Provider):
             for tool in tools
         ]
 
+    def _message_to_ollama(self, msg: Message) -> list[dict]:
+        """Convert a Message to Ollama's format (one or more chat messages)."""
+        ollama_messages = []
+
+        if msg.content:
+            ollama_messages.append({
+                "role": msg.role,
+                "content": msg.content,
+            })
+
+        for tc in msg.tool_calls:
+            ollama_messages.append({
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [{
+                    "function": {
+                        "name": tc.name,
+                        "arguments": tc.args,
+                    },
+                }],
+            })
+
+        for tr in msg.tool_results:
+            ollama_messages.append({
+                "role": "tool",
+                "content": tr.content,
+            })
+
+        return ollama_messages
+
     def _messages_to_ollama(
         self, messages: list[Message], system: str
     ) -> list[dict]:
-        """Convert messages to Ollama's format."""
+        """Convert messages to Ollama's format, reusing cached conversions."""
         ollama_messages = []
 
         if system:
             ollama_messages.append({"role": "system", "content": system})
 
         for msg in messages:
-            if msg.content:
-                ollama_messages.append({
-                    "role": msg.role,
-                    "content": msg.content,
-                })
-
-            for tc in msg.tool_calls:
-                ollama_messages.append({
-                    "role": "assistant",
-                    "content": "",
-                    "tool_calls": [{
-                        "function": {
-                            "name": tc.name,
-                            "arguments": tc.args,
-                        },
-                    }],
-                })
-
-            for tr in msg.tool_results:
-                ollama_messages.append({
-                    "role": "tool",
-                    "content": tr.content,
-                })
+            ollama_messages.extend(self._cached_message(msg, self._message_to_ollama))
 
         return ollama_messages
 
@@ -82,7 +90,17 @@ class OllamaProvider(Provider):
         tools: list["Tool"],
         system: str = "",
     ) -> AsyncIterator[StreamEvent]:
-        """Stream a response from Ollama."""
+        """Stream a response from Ollama, merging small text chunks."""
+        async for event in coalesce_text(self._stream_events(messages, tools, system)):
+            yield event
+
+    async def _stream_events(
+        self,
+        messages: list[Message],
+        tools: list["Tool"],
+        system: str,
+    ) -> AsyncIterator[StreamEvent]:
+        """Yield one event per chunk received from Ollama."""
         ollama_messages = self._messages_to_ollama(messages, system)
 
         tool_calls = []
@@ -91,7 +109,7 @@ class OllamaProvider(Provider):
         async for chunk in await self.client.chat(
             model=self.model_id,
             messages=ollama_messages,
-            tools=self._tools_to_ollama(tools) if tools else None,
+            tools=self._cached_tools(tools, self._tools_to_ollama) if tools else None,
             stream=True,
         ):
             message = chunk.get("message", {})
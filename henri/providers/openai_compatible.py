@@ -1,6 +1,5 @@
 """OpenAI-compatible provider for VLLM, LocalAI, llama.cpp, etc."""
 
-import json
 from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING
 
@@ -10,6 +9,7 @@ if TYPE_CHECKING:
     from henri.tools.base import Tool
 
 from henri.messages import Message, ToolCall
+from henri.providers._incjson import IncrementalJsonParser
 from henri.providers.base import Provider, StreamEvent, Usage
 
 
@@ -43,42 +43,50 @@ class OpenAICompatibleProvider(Provider):
             for tool in tools
         ]
 
+    def _message_to_openai(self, msg: Message) -> list[dict]:
+        """Convert a Message to OpenAI's format (one or more chat messages)."""
+        openai_messages = []
+
+        if msg.content:
+            openai_messages.append({
+                "role": msg.role,
+                "content": msg.content,
+            })
+
+        for tc in msg.tool_calls:
+            openai_messages.append({
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": tc.args_json,
+                    },
+                }],
+            })
+
+        for tr in msg.tool_results:
+            openai_messages.append({
+                "role": "tool",
+                "tool_call_id": tr.tool_call_id,
+                "content": tr.content,
+            })
+
+        return openai_messages
+
     def _messages_to_openai(
         self, messages: list[Message], system: str
     ) -> list[dict]:
-        """Convert messages to OpenAI's format."""
+        """Convert messages to OpenAI's format, reusing cached conversions."""
         openai_messages = []
 
         if system:
             openai_messages.append({"role": "system", "content": system})
 
         for msg in messages:
-            if msg.content:
-                openai_messages.append({
-                    "role": msg.role,
-                    "content": msg.content,
-                })
-
-            for tc in msg.tool_calls:
-                openai_messages.append({
-                    "role": "assistant",
-                    "content": None,
-                    "tool_calls": [{
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.args),
-                        },
-                    }],
-                })
-
-            for tr in msg.tool_results:
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": tr.tool_call_id,
-                    "content": tr.content,
-                })
+            openai_messages.extend(self._cached_message(msg, self._message_to_openai))
 
         return openai_messages
 
@@ -99,7 +107,7 @@ class OpenAICompatibleProvider(Provider):
             "stream_options": {"include_usage": True},
         }
         if tools:
-            kwargs["tools"] = self._tools_to_openai(tools)
+            kwargs["tools"] = self._cached_tools(tools, self._tools_to_openai)
 
         response = await self.client.chat.completions.create(**kwargs)
 
@@ -137,7 +145,7 @@ class OpenAICompatibleProvider(Provider):
                         tool_call_builders[idx] = {
                             "id": tc_delta.id or "",
                             "name": "",
-                            "arguments": "",
+                            "arguments": IncrementalJsonParser(),
                         }
                     builder = tool_call_builders[idx]
                     if tc_delta.id:
@@ -146,7 +154,7 @@ class OpenAICompatibleProvider(Provider):
                         if tc_delta.function.name:
                             builder["name"] = tc_delta.function.name
                         if tc_delta.function.arguments:
-                            builder["arguments"] += tc_delta.function.arguments
+                            builder["arguments"].feed(tc_delta.function.arguments)
 
             # Track finish reason but don't yield yet (usage comes in next chunk)
             if finish_reason:
@@ -155,16 +163,12 @@ class OpenAICompatibleProvider(Provider):
         # After stream ends, yield final event with usage
         if final_finish_reason:
             tool_calls = []
-            for idx in sorted(tool_call_builders.keys()):
-                builder = tool_call_builders[idx]
-                try:
-                    args = json.loads(builder["arguments"]) if builder["arguments"] else {}
-                except json.JSONDecodeError:
-                    args = {}
+            # Servers send tool calls in index order, and dicts keep insertion order
+            for builder in tool_call_builders.values():
                 tool_calls.append(ToolCall(
                     id=builder["id"],
                     name=builder["name"],
-                    args=args,
+                    args=builder["arguments"].try_finalize() or {},
                 ))
 
             stop_reason = "tool_use" if final_finish_reason == "tool_calls" else "end_turn"
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
 from henri.config import DEFAULT_VERTEX_MODEL, DEFAULT_VERTEX_REGION
 from henri.messages import Message, ToolCall
+from henri.providers._incjson import IncrementalJsonParser
 from henri.providers.base import Provider, StreamEvent, Usage
 
 
@@ -32,6 +33,7 @@ class VertexProvider(Provider):
                 "Vertex provider requires GOOGLE_CLOUD_PROJECT env var or project parameter"
             )
         self.client = AnthropicVertex(region=region, project_id=project)
+        self._system_cache: tuple[str, list[dict]] | None = None
 
     def _message_to_anthropic(self, msg: Message) -> dict:
         """Convert a Message to Anthropic's format."""
@@ -59,6 +61,17 @@ class VertexProvider(Provider):
         role = "user" if msg.role == "tool" else msg.role
         return {"role": role, "content": content}
 
+    def _system_to_anthropic(self, system: str) -> list[dict]:
+        """Convert the system prompt to a text block marked for prompt caching.
+
+        The system prompt is identical every turn, so the block is built
+        once, and cache_control lets Claude reuse the cached prefix.
+        """
+        if self._system_cache is None or self._system_cache[0] != system:
+            blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            self._system_cache = (system, blocks)
+        return self._system_cache[1]
+
     def _tools_to_anthropic(self, tools: list["Tool"]) -> list[dict]:
         """Convert tools to Anthropic's format."""
         return [
@@ -77,7 +90,7 @@ class VertexProvider(Provider):
         system: str = "",
     ) -> AsyncIterator[StreamEvent]:
         """Stream a response from Claude via Vertex AI."""
-        anthropic_messages = [self._message_to_anthropic(m) for m in messages]
+        anthropic_messages = [self._cached_message(m, self._message_to_anthropic) for m in messages]
 
         request = {
             "model": self.model_id,
@@ -86,15 +99,15 @@ class VertexProvider(Provider):
         }
 
         if system:
-            request["system"] = system
+            request["system"] = self._system_to_anthropic(system)
 
         if tools:
-            request["tools"] = self._tools_to_anthropic(tools)
+            request["tools"] = self._cached_tools(tools, self._tools_to_anthropic)
 
         tool_calls = []
         current_tool_id = None
         current_tool_name = None
-        current_tool_input = ""
+        current_tool_input = IncrementalJsonParser()
 
         with self.client.messages.stream(**request) as stream:
             for event in stream:
@@ -102,22 +115,21 @@ class VertexProvider(Provider):
                     if event.content_block.type == "tool_use":
                         current_tool_id = event.content_block.id
                         current_tool_name = event.content_block.name
-                        current_tool_input = ""
+                        current_tool_input = IncrementalJsonParser()
                         yield StreamEvent(tool_use_started=True)
 
                 elif event.type == "content_block_delta":
                     if event.delta.type == "text_delta":
                         yield StreamEvent(text=event.delta.text)
                     elif event.delta.type == "input_json_delta":
-                        current_tool_input += event.delta.partial_json
+                        current_tool_input.feed(event.delta.partial_json)
 
                 elif event.type == "content_block_stop":
                     if current_tool_id and current_tool_name:
-                        import json
                         tool_calls.append(ToolCall(
                             id=current_tool_id,
                             name=current_tool_name,
-                            args=json.loads(current_tool_input) if current_tool_input else {},
+                            args=current_tool_input.try_finalize() or {},
                         ))
                         current_tool_id = None
                         current_tool_name = None
@@ -130,9 +142,15 @@ class VertexProvider(Provider):
             stop_reason = final_message.stop_reason if final_message else "end_turn"
             usage = None
             if final_message and final_message.usage:
+                u = final_message.usage
+                # Cached prompt tokens are reported separately from input_tokens
                 usage = Usage(
-                    input_tokens=final_message.usage.input_tokens,
-                    output_tokens=final_message.usage.output_tokens,
+                    input_tokens=(
+                        u.input_tokens
+                        + (u.cache_read_input_tokens or 0)
+                        + (u.cache_creation_input_tokens or 0)
+                    ),
+                    output_tokens=u.output_tokens,
                 )
 
         yield StreamEvent(
@@ -1,11 +1,27 @@
 """Base tool class and built-in tools."""
 
+import asyncio
+import collections
+import functools
+import os
+import re
+import secrets
+import stat
 import subprocess
+import threading
+import time
 import urllib.request
 from abc import ABC, abstractmethod
+from collections.abc import Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import Any
 
-from bs4 import BeautifulSoup
+try:  # optional C parser, see the fast-html extra
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
 
 class Tool(ABC):
@@ -15,12 +31,259 @@ class Tool(ABC):
     description: str
     parameters: dict  # JSON Schema
     requires_permission: bool = False
+    # Changes nothing and same args give same result: duplicates can share one
+    # run, and such calls run concurrently (others run one at a time, in order)
+    idempotent: bool = False
+
+    @functools.cached_property
+    def required_args(self) -> tuple[str, ...]:
+        """Names listed in parameters["required"], looked up on first use."""
+        return tuple(self.parameters.get("required", ()))
 
     @abstractmethod
     def execute(self, **kwargs) -> str:
         """Execute the tool and return the result."""
         pass
 
+    async def aexecute(self, **kwargs) -> str:
+        """Execute the tool without blocking the event loop.
+
+        By default execute() runs in a worker thread. Tools that mostly wait
+        on a subprocess override this to await it directly.
+        """
+        return await asyncio.to_thread(self.execute, **kwargs)
+
+
+@functools.lru_cache(maxsize=512)
+def _expand_path(path: str) -> Path:
+    """Return Path(path).expanduser(), cached since tools reuse the same paths."""
+    return Path(path).expanduser()
+
+
+def stat_cache_key(st: os.stat_result) -> tuple | None:
+    """Return a key for a file's current contents from its stat, or None.
+
+    The key is (device, inode, mtime, size). None means it can't be trusted
+    yet: a file modified within the last second could be written again
+    without its mtime or size changing. Files reporting size 0 (procfs)
+    change without their mtime moving, so they get None as well.
+    """
+    if st.st_size == 0 or time.time_ns() - st.st_mtime_ns <= 1_000_000_000:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def cache_put(cache: dict, key, value, max_size: int) -> None:
+    """Store a value in a bounded cache, clearing it first when full."""
+    if len(cache) >= max_size:
+        cache.clear()
+    cache[key] = value
+
+
+def _write_atomic(p: Path, data: bytes) -> None:
+    """Replace a file's contents by writing a temporary file and renaming it.
+
+    Other readers, and the file after a crash, see either the old or the
+    new contents, never a partial write. A symlink is written through
+    rather than replaced. Renaming gives the file a new inode, so files
+    whose identity matters are written in place instead: anything but a
+    plain regular file (devices, FIFOs), hard-linked files, files we may
+    not write to (the write then fails as before), files owned by someone
+    else or carrying extended attributes or ACLs, and files in
+    directories we cannot create files in.
+    """
+    try:
+        st = os.lstat(p)
+        if stat.S_ISLNK(st.st_mode):
+            p = Path(os.path.realpath(p))
+            st = os.stat(p)
+    except FileNotFoundError:
+        mode = None  # New file: the kernel applies the umask
+        replace = True
+    else:
+        mode = stat.S_IMODE(st.st_mode)
+        replace = (
+            stat.S_ISREG(st.st_mode)
+            and st.st_nlink == 1
+            and st.st_uid == os.geteuid()
+            and os.access(p, os.W_OK)
+            and not _has_xattrs(p)
+        )
+
+    fd = None
+    while replace:
+        tmp = p.parent / f".{p.name}.{secrets.token_hex(4)}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC, 0o666)
+            break
+        except FileExistsError:
+            continue
+        except PermissionError:
+            break
+    if fd is None:
+        with open(p, "wb") as f:
+            f.write(data)
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _has_xattrs(p: Path) -> bool:
+    """Check if a file has extended attributes (including ACLs) to preserve."""
+    if not hasattr(os, "listxattr"):
+        return False  # Not Linux: no cheap check, assume none
+    try:
+        return bool(os.listxattr(p))
+    except OSError:
+        return False  # Unsupported by the filesystem
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode subprocess output like text=True does, normalizing newlines."""
+    return data.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+# A command made only of these characters has no quoting, expansion,
+# redirection or control operators, so the shell would just split it on
+# whitespace and run it
+_PLAIN_COMMAND = re.compile(r"[\w./,:@%+= \t-]+")
+
+# Words the shell handles itself even when a program of the same name exists
+# (whose output can differ, e.g. /bin/echo -e or /bin/pwd's physical path)
+_SHELL_WORDS = frozenset({
+    ".", ":", "[", "alias", "bg", "cd", "command", "echo", "eval", "exec", "exit",
+    "export", "fg", "hash", "jobs", "printf", "pwd", "read", "readonly", "set",
+    "shift", "source", "test", "time", "trap", "type", "ulimit", "umask",
+    "unalias", "unset", "wait",
+})
+
+
+def _plain_argv(command: str) -> list[str] | None:
+    """Split a command that needs no shell into argv, else return None."""
+    if not _PLAIN_COMMAND.fullmatch(command):
+        return None
+    argv = command.split()
+    if not argv or "=" in argv[0] or argv[0] in _SHELL_WORDS:
+        return None
+    return argv
+
+
+async def _read_tail(stream: asyncio.StreamReader, limit: int) -> bytes:
+    """Read a stream to EOF, keeping only its last `limit` bytes.
+
+    If anything was dropped, the result starts with a "[truncated...]" line.
+    """
+    chunks: collections.deque[bytes] = collections.deque()
+    size = 0
+    dropped = False
+    while chunk := await stream.read(65536):
+        chunks.append(chunk)
+        size += len(chunk)
+        while size - len(chunks[0]) >= limit:
+            size -= len(chunks.popleft())
+            dropped = True
+    data = b"".join(chunks)
+    if size > limit:
+        data = data[-limit:]
+        dropped = True
+    return b"[truncated...]\n" + data if dropped else data
+
+
+async def run_command(
+    cmd: str | list[str], timeout: float, limit: int | None = None
+) -> tuple[int, str, str]:
+    """Run a command without blocking the event loop.
+
+    `cmd` is a shell command string or an argv list. A shell command with
+    no shell syntax is run directly, saving the /bin/sh process. Returns
+    the exit code and the decoded stdout and stderr. With a `limit`, only
+    the last `limit` bytes of each stream are kept (see _read_tail). If
+    the command runs longer than `timeout` seconds it is killed and
+    asyncio.TimeoutError is raised.
+    """
+    proc = None
+    argv = _plain_argv(cmd) if isinstance(cmd, str) else cmd
+    if argv is not None:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError:
+            if argv is cmd:
+                raise
+            # Not found or not executable: let the shell report it
+    if proc is None:
+        proc = await asyncio.create_subprocess_shell(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    if limit is None:
+        output = proc.communicate()
+    else:
+        output = asyncio.gather(
+            _read_tail(proc.stdout, limit), _read_tail(proc.stderr, limit), proc.wait()
+        )
+    try:
+        stdout, stderr, *_ = await asyncio.wait_for(output, timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, _decode_output(stdout), _decode_output(stderr)
+
+
+def run_sync(coro: Coroutine[Any, Any, str]) -> str:
+    """Run a coroutine to completion from synchronous code.
+
+    For the execute() of tools that implement aexecute() natively. Unlike a
+    bare asyncio.run() this also works when called from a thread whose
+    event loop is running, by running the coroutine on a fresh loop in a
+    worker thread; like any synchronous call, it blocks the caller until
+    done.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _read_capped(
+    proc: asyncio.subprocess.Process, limit: int
+) -> tuple[bytes, bytes, bool]:
+    """Read a process's stdout up to `limit` bytes, plus all of stderr.
+
+    If stdout goes past the limit the process is killed, since the rest
+    would be thrown away. Returns (stdout, stderr, cut).
+    """
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    try:
+        out = bytearray()
+        while len(out) <= limit:
+            chunk = await proc.stdout.read(65536)
+            if not chunk:
+                break
+            out += chunk
+        if len(out) > limit:
+            proc.kill()
+            await proc.wait()
+            return bytes(out[:limit]), b"", True
+        await proc.wait()
+        return bytes(out), await stderr_task, False
+    finally:
+        stderr_task.cancel()
+
 
 class BashTool(Tool):
     """Execute shell commands."""
@@ -40,26 +303,29 @@ class BashTool(Tool):
     requires_permission = True
 
     def execute(self, command: str) -> str:
+        return run_sync(self.aexecute(command))
+
+    async def aexecute(self, command: str) -> str:
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
-            output = result.stdout
-            if result.stderr:
-                output += f"\n[stderr]\n{result.stderr}"
-            if result.returncode != 0:
-                output += f"\n[exit code: {result.returncode}]"
-            return output or "(no output)"
-        except subprocess.TimeoutExpired:
+            returncode, stdout, stderr = await run_command(command, timeout=120, limit=100_000)
+            # Join once rather than copying the output for each suffix
+            parts = [stdout]
+            if stderr:
+                parts += ("\n[stderr]\n", stderr)
+            if returncode != 0:
+                parts.append(f"\n[exit code: {returncode}]")
+            return "".join(parts) or "(no output)"
+        except asyncio.TimeoutError:
             return "[error: command timed out after 120 seconds]"
         except Exception as e:
             return f"[error: {e}]"
 
 
+# Contents returned by ReadFileTool, keyed by file identity, mtime and size
+READ_CACHE_SIZE = 64
+_read_cache: dict[tuple, str] = {}
+
+
 class ReadFileTool(Tool):
     """Read file contents."""
 
@@ -76,21 +342,53 @@ class ReadFileTool(Tool):
         "required": ["path"],
     }
     requires_permission = True  # Permission managed by path (auto-allow within cwd)
+    idempotent = True
 
     def execute(self, path: str) -> str:
         try:
-            p = Path(path).expanduser()
-            if not p.exists():
+            p = _expand_path(path)
+            try:
+                st = p.stat()
+            except (FileNotFoundError, NotADirectoryError):
                 return f"[error: file not found: {path}]"
-            if not p.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return f"[error: not a file: {path}]"
-            content = p.read_text()
-            if len(content) > 100_000:
-                return content[:100_000] + "\n[truncated...]"
+
+            key = stat_cache_key(st)
+            content = _read_cache.get(key) if key else None
+            if content is None:
+                content = self._read(p)
+                if key:
+                    cache_put(_read_cache, key, content, READ_CACHE_SIZE)
             return content
         except Exception as e:
             return f"[error: {e}]"
 
+    def _read(self, p: Path) -> str:
+        """Read a file, truncated to 100,000 characters."""
+        # More than 100,000 chars even at 4 bytes each is never needed,
+        # so a single bounded read replaces the open/read/close wrappers
+        fd = os.open(p, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            # One read is usually enough, but procfs, sysfs and some network
+            # filesystems return less than asked before EOF
+            chunks = []
+            size = 0
+            while size < 400_000 and (chunk := os.read(fd, 400_000 - size)):
+                chunks.append(chunk)
+                size += len(chunk)
+            raw = b"".join(chunks)
+            cut = size == 400_000 and os.read(fd, 1) != b""
+        finally:
+            os.close(fd)
+        # A cut can split a multi-byte character, so only then replace errors
+        content = raw.decode("utf-8", errors="replace" if cut else "strict")
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        if cut or len(content) > 100_000:
+            return content[:100_000] + "\n[truncated...]"
+        return content
+
 
 class WriteFileTool(Tool):
     """Write content to a file."""
@@ -115,10 +413,15 @@ class WriteFileTool(Tool):
 
     def execute(self, path: str, content: str) -> str:
         try:
-            p = Path(path).expanduser()
-            p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(content)
-            return f"[wrote {len(content)} bytes to {path}]"
+            p = _expand_path(path)
+            data = content.encode()
+            try:
+                _write_atomic(p, data)
+            except FileNotFoundError:
+                # Parent directory missing: create it only in this case
+                p.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(p, data)
+            return f"[wrote {len(data)} bytes to {path}]"
         except Exception as e:
             return f"[error: {e}]"
 
@@ -161,14 +464,25 @@ class EditFileTool(Tool):
         self, path: str, old_string: str, new_string: str, replace_all: bool = False
     ) -> str:
         try:
-            p = Path(path).expanduser()
-            if not p.exists():
+            p = _expand_path(path)
+            try:
+                st = p.stat()
+            except (FileNotFoundError, NotADirectoryError):
                 return f"[error: file not found: {path}]"
-            if not p.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return f"[error: not a file: {path}]"
 
             content = p.read_text()
-            count = content.count(old_string)
+
+            # Find every occurrence in one pass, then build the result from
+            # those positions instead of scanning again with replace()
+            positions = []
+            step = len(old_string) or 1  # "" matches at every position
+            i = content.find(old_string)
+            while i >= 0:
+                positions.append(i)
+                i = content.find(old_string, i + step)
+            count = len(positions)
 
             if count == 0:
                 return f"[error: old_string not found in {path}]"
@@ -178,19 +492,26 @@ class EditFileTool(Tool):
                     f"Use replace_all=true or provide more context to make it unique.]"
                 )
 
-            if replace_all:
-                new_content = content.replace(old_string, new_string)
-                replacements = count
-            else:
-                new_content = content.replace(old_string, new_string, 1)
-                replacements = 1
-
-            p.write_text(new_content)
-            return f"[replaced {replacements} occurrence(s) in {path}]"
+            parts = []
+            last = 0
+            for pos in positions:
+                parts.append(content[last:pos])
+                parts.append(new_string)
+                last = pos + len(old_string)
+            parts.append(content[last:])
+            new_content = "".join(parts)
+
+            _write_atomic(p, new_content.encode())
+            return f"[replaced {count} occurrence(s) in {path}]"
         except Exception as e:
             return f"[error: {e}]"
 
 
+# Results of single-file greps, keyed by arguments and file identity/mtime
+GREP_CACHE_SIZE = 64
+_grep_cache: dict[tuple, str] = {}
+
+
 class GrepTool(Tool):
     """Search for patterns in files using ripgrep."""
 
@@ -224,6 +545,7 @@ class GrepTool(Tool):
         "required": ["pattern"],
     }
     requires_permission = True  # Permission managed by path (auto-allow within cwd)
+    idempotent = True
 
     def execute(
         self,
@@ -232,32 +554,77 @@ class GrepTool(Tool):
         glob: str | None = None,
         ignore_case: bool = False,
     ) -> str:
+        return run_sync(self.aexecute(pattern, path, glob, ignore_case))
+
+    async def aexecute(
+        self,
+        pattern: str,
+        path: str = ".",
+        glob: str | None = None,
+        ignore_case: bool = False,
+    ) -> str:
+        # Searches of a single file are cached by its identity and mtime.
+        # Directories are not: their mtime doesn't change when a file in
+        # them is edited, so there is no cheap way to tell a result is stale.
+        try:
+            st = os.stat(_expand_path(path))
+        except (OSError, ValueError):
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return await self._search(pattern, path, glob, ignore_case)
+
+        file_key = stat_cache_key(st)
+        if file_key is None:
+            return await self._search(pattern, path, glob, ignore_case)
+        key = (pattern, path, glob, ignore_case, file_key)
+        result = _grep_cache.get(key)
+        if result is None:
+            result = await self._search(pattern, path, glob, ignore_case)
+            if not result.startswith("[error"):
+                cache_put(_grep_cache, key, result, GREP_CACHE_SIZE)
+        return result
+
+    async def _search(
+        self, pattern: str, path: str, glob: str | None, ignore_case: bool
+    ) -> str:
+        """Run rg and format its output."""
         try:
-            cmd = ["rg", "--line-number", "--max-count", "100"]
+            # Let rg skip what would be cut anyway: overlong lines and huge files
+            cmd = [
+                "rg", "--line-number", "--max-count", "100",
+                "--max-columns", "500", "--max-filesize", "10M",
+            ]
             if ignore_case:
                 cmd.append("--ignore-case")
             if glob:
                 cmd.extend(["--glob", glob])
             cmd.extend([pattern, path])
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
             )
-            output = result.stdout
-            if result.returncode == 1:  # No matches
-                return "(no matches)"
-            if result.returncode != 0:
-                return f"[error: {result.stderr}]"
-            if len(output) > 50_000:
+            try:
+                # 50,000 chars is at most 200,000 bytes
+                stdout, stderr, cut = await asyncio.wait_for(
+                    _read_capped(proc, 200_000), timeout=30
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return "[error: search timed out after 30 seconds]"
+            if not cut:
+                if proc.returncode == 1:  # No matches
+                    return "(no matches)"
+                if proc.returncode != 0:
+                    return f"[error: {_decode_output(stderr)}]"
+            output = _decode_output(stdout)
+            if cut or len(output) > 50_000:
                 output = output[:50_000] + "\n[truncated...]"
             return output or "(no matches)"
         except FileNotFoundError:
             return "[error: ripgrep (rg) not found. Install it: brew install ripgrep]"
-        except subprocess.TimeoutExpired:
-            return "[error: search timed out after 30 seconds]"
         except Exception as e:
             return f"[error: {e}]"
 
@@ -283,10 +650,11 @@ class GlobTool(Tool):
         "required": ["pattern"],
     }
     requires_permission = True  # Permission managed by path (auto-allow within cwd)
+    idempotent = True
 
     def execute(self, pattern: str, path: str = ".") -> str:
         try:
-            p = Path(path).expanduser()
+            p = _expand_path(path)
             if not p.exists():
                 return f"[error: directory not found: {path}]"
             if not p.is_dir():
@@ -300,6 +668,73 @@ class GlobTool(Tool):
             return f"[error: {e}]"
 
 
+class _HTMLTextExtractor(HTMLParser):
+    """Collect the stripped text of an HTML document, one line per text node.
+
+    Text inside script, style and head is skipped. Instances are reused:
+    reset() clears the collected text along with the parser state.
+    """
+
+    SKIP_TAGS = frozenset({"script", "style", "head"})
+
+    def __init__(self):
+        self.text: list[str] = []
+        self._skip_depth = 0
+        super().__init__()
+
+    def reset(self) -> None:
+        super().reset()
+        self.text.clear()
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and (data := data.strip()):
+            self.text.append(data)
+
+    def get_text(self) -> str:
+        return "\n".join(self.text)
+
+
+# One extractor per thread, since tools may run concurrently in threads
+_extractors = threading.local()
+
+
+# Runs of newlines left by whitespace-only text nodes
+_BLANK_LINES = re.compile(r"\n{2,}")
+
+
+def _html_to_text(html: str) -> str:
+    """Convert HTML to plain text, one line per text node.
+
+    Uses selectolax when installed, otherwise this thread's reusable
+    _HTMLTextExtractor.
+    """
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(_HTMLTextExtractor.SKIP_TAGS))
+        root = tree.body or tree.root
+        if root is None:
+            return ""
+        return _BLANK_LINES.sub("\n", root.text(separator="\n", strip=True)).strip("\n")
+
+    extractor = getattr(_extractors, "extractor", None)
+    if extractor is None:
+        extractor = _extractors.extractor = _HTMLTextExtractor()
+    else:
+        extractor.reset()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.get_text()
+
+
 class WebFetchTool(Tool):
     """Fetch content from a URL."""
 
@@ -316,6 +751,7 @@ class WebFetchTool(Tool):
         "required": ["url"],
     }
     requires_permission = True  # Network access requires permission
+    idempotent = True
 
     def execute(self, url: str) -> str:
         try:
@@ -328,18 +764,24 @@ class WebFetchTool(Tool):
                 headers={"User-Agent": "Henri/0.1 (AI coding assistant)"},
             )
             with urllib.request.urlopen(req, timeout=30) as response:
-                content_type = response.headers.get("Content-Type", "")
-                content = response.read().decode("utf-8", errors="replace")
+                is_html = "html" in response.headers.get("Content-Type", "").lower()
+
+                # Read no more than can end up in the result: 50,000 chars
+                # of text (at most 4 bytes each), or a bounded amount of
+                # HTML to extract them from
+                limit = 2_000_000 if is_html else 200_000
+                raw = response.read(limit)
+                cut = len(raw) == limit and bool(response.read(1))
+                content = raw.decode("utf-8", errors="replace")
 
                 # Convert HTML to text
-                if "html" in content_type.lower():
-                    soup = BeautifulSoup(content, "html.parser")
-                    for tag in soup(["script", "style", "head"]):
-                        tag.decompose()
-                    content = soup.get_text(separator="\n", strip=True)
+                if is_html:
+                    content = _html_to_text(content)
 
                 if len(content) > 50_000:
                     content = content[:50_000] + "\n[truncated...]"
+                elif cut:
+                    content += "\n[truncated...]"
 
                 return content or "(empty response)"
         except urllib.error.HTTPError as e:
@@ -350,14 +792,18 @@ class WebFetchTool(Tool):
             return f"[error: {e}]"
 
 
+# Tools keep no per-instance state, so one instance of each is shared
+_DEFAULT_TOOLS = (
+    BashTool(),
+    ReadFileTool(),
+    WriteFileTool(),
+    EditFileTool(),
+    GrepTool(),
+    GlobTool(),
+    WebFetchTool(),
+)
+
+
 def get_default_tools() -> list[Tool]:
-    """Return the default set of tools."""
-    return [
-        BashTool(),
-        ReadFileTool(),
-        WriteFileTool(),
-        EditFileTool(),
-        GrepTool(),
-        GlobTool(),
-        WebFetchTool(),
-    ]
+    """Return the default set of tools (a new list of shared instances)."""
+    return list(_DEFAULT_TOOLS)
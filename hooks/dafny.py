@@ -6,9 +6,56 @@ Usage:
 Adds dafny_verify tool with path-based permissions.
 """
 
-import subprocess
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
 
-from henri.tools.base import Tool
+from henri.tools.base import Tool, cache_put, run_command, run_sync, stat_cache_key
+
+# Output of successful verifications keyed by (path, source hash, dafny version)
+VERIFY_CACHE_SIZE = 256
+_verify_cache: dict[tuple[str, str, str], str] = {}
+_dafny_version: str | None = None
+
+# Sources that include other files are not cached, since a change to an
+# included file does not show in the source's own hash
+_INCLUDE = re.compile(rb"^\s*include\b", re.MULTILINE)
+
+
+# Source digests keyed by path and stat_cache_key(), so
+# an unchanged file is not read and hashed again. None marks a source
+# whose result is not cached.
+_digest_cache: dict[tuple, str | None] = {}
+
+
+def _source_digest(path: str) -> str | None:
+    """Return a hash of a source file, or None if it can't be cached."""
+    try:
+        st = os.stat(path)
+        file_key = stat_cache_key(st)
+        key = (path, file_key)
+        if file_key and key in _digest_cache:
+            return _digest_cache[key]
+        data = Path(path).read_bytes()
+    except (OSError, ValueError):
+        return None  # Let dafny report it
+    digest = None
+    if not _INCLUDE.search(data):
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if file_key:
+        cache_put(_digest_cache, key, digest, VERIFY_CACHE_SIZE)
+    return digest
+
+
+async def _get_dafny_version() -> str:
+    """Return `dafny --version` output, asking dafny only once."""
+    global _dafny_version
+    if _dafny_version is None:
+        _, output, _ = await run_command(["dafny", "--version"], timeout=30)
+        _dafny_version = output.strip()
+    return _dafny_version
 
 
 class DafnyVerifyTool(Tool):
@@ -29,20 +76,28 @@ class DafnyVerifyTool(Tool):
     requires_permission = True
 
     def execute(self, path: str) -> str:
+        return run_sync(self.aexecute(path))
+
+    async def aexecute(self, path: str) -> str:
         try:
-            result = subprocess.run(
-                ["dafny", "verify", path],
-                capture_output=True,
-                text=True,
-                timeout=120,
-            )
-            output = result.stdout
-            if result.stderr:
-                output += f"\n{result.stderr}"
-            return output or "(no output)"
+            key = None
+            digest = _source_digest(path)
+            if digest is not None:
+                key = (path, digest, await _get_dafny_version())
+                cached = _verify_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            returncode, stdout, stderr = await run_command(["dafny", "verify", path], timeout=120)
+            output = "\n".join((stdout, stderr)) if stderr else stdout
+            output = output or "(no output)"
+            # Failures may be time or resource limits, which a retry can pass
+            if key is not None and returncode == 0:
+                cache_put(_verify_cache, key, output, VERIFY_CACHE_SIZE)
+            return output
         except FileNotFoundError:
             return "[error: dafny not found. Install it: https://github.com/dafny-lang/dafny]"
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return "[error: verification timed out after 120 seconds]"
         except Exception as e:
             return f"[error: {e}]"